@@ -0,0 +1,109 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+'==================== БЮДЖЕТ ВРЕМЕНИ ИМПОРТА ===================='
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Бюджеты в миллисекундах на собственный импорт модуля и модули,
+# которые не должны загружаться при старте (только по мере необходимости).
+# Для streamlit_app время самого streamlit вычитается: в запущенном
+# дашборде он уже загружен, и мы на него не влияем.
+BUDGETS = {
+    "main": {
+        "budget_ms": 50,
+        "exclude": [],
+        "forbidden": ["pandas", "numpy", "requests"],
+    },
+    "streamlit_app": {
+        "budget_ms": 50,
+        "exclude": ["streamlit"],
+        "forbidden": ["pandas", "plotly.express"],
+    },
+}
+
+
+def parse_importtime(stderr: str) -> dict:
+    """
+    Разбирает вывод `python -X importtime`.
+    Возвращает {имя модуля: кумулятивное время в мкс} для всех загруженных модулей.
+    """
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        cumulative[name.strip()] = int(cumulative_us)
+    return cumulative
+
+
+def measure_import(module: str) -> dict:
+    """
+    Импортирует module в отдельном интерпретаторе с -X importtime
+    и возвращает разобранные времена.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Не удалось импортировать '{module}':\n{result.stderr}")
+    return parse_importtime(result.stderr)
+
+
+def check_module(module: str, budget_ms: float, exclude: list, forbidden: list, repeat: int) -> bool:
+    """
+    Замеряет импорт module repeat раз (берётся медиана) и сравнивает с бюджетом.
+    Печатает результат и возвращает True, если бюджет соблюдён.
+    """
+    # Первый прогон прогревает кэш байткода и не учитывается
+    measure_import(module)
+
+    timings = []
+    loaded = {}
+    for _ in range(repeat):
+        loaded = measure_import(module)
+        own_us = loaded[module] - sum(loaded.get(name, 0) for name in exclude)
+        timings.append(own_us / 1000)
+    median_ms = statistics.median(timings)
+
+    leaked = [name for name in forbidden if name in loaded]
+    ok = median_ms <= budget_ms and not leaked
+
+    status = "OK" if ok else "FAIL"
+    print(f"[{status}] import {module}: {median_ms:.1f} мс (бюджет {budget_ms} мс)")
+    if leaked:
+        print(f"       при старте загружаются тяжёлые модули: {', '.join(leaked)}")
+    return ok
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Проверка времени импорта CLI и дашборда.")
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Количество замеров на модуль (берётся медиана)."
+    )
+    parser.add_argument(
+        "--modules",
+        nargs="+",
+        default=list(BUDGETS),
+        choices=list(BUDGETS),
+        help="Какие модули проверять."
+    )
+    args = parser.parse_args()
+    if args.repeat < 1:
+        parser.error("--repeat должен быть не меньше 1.")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    results = [check_module(name, repeat=args.repeat, **BUDGETS[name]) for name in args.modules]
+    sys.exit(0 if all(results) else 1)
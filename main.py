@@ -1,18 +1,21 @@
 import argparse
-import pandas as pd
-
-from modules.utils import download_data, txt_to_df
-from modules.data_transformation import validate_raw_data, add_new_features
-from modules.db_manager import (
-    connect_db,
-    load_df_to_db,
-    table_to_dataframe,
-    close_db,
-    create_clean_table,
-    insert_clean_data
-)
 
 def run_pipeline(url: str, local_filename: str, db_name: str):
+    # Тяжёлые зависимости (pandas, requests, numpy) импортируем только здесь,
+    # чтобы parse_arguments() и --help не платили за их загрузку
+    import pandas as pd
+
+    from modules.utils import download_data, txt_to_df
+    from modules.data_transformation import validate_raw_data, add_new_features
+    from modules.db_manager import (
+        connect_db,
+        load_df_to_db,
+        table_to_dataframe,
+        close_db,
+        create_clean_table,
+        insert_clean_data
+    )
+
     # Скачиваем файл
     print(f"Скачивание данных с {url}...")
     download_data(url, local_filename)
@@ -1,6 +1,11 @@
-import pandas as pd
+from __future__ import annotations
+
 import sqlite3
 import sys
+from typing import TYPE_CHECKING, Iterator, Optional, Sequence
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 def connect_db(db_name: str) -> sqlite3.Connection:
     """
@@ -37,12 +42,41 @@ def table_to_dataframe(db_name: str, table_name: str) -> pd.DataFrame:
     Подключается к базе SQLite и выгружает данные из указанной таблицы.
     Возвращает DataFrame с данными.
     """
+    import pandas as pd
+
     conn = connect_db(db_name)
     query = f"SELECT * FROM {table_name};"
     df = pd.read_sql(query, conn)
     close_db(conn)
     return df
-    
+
+
+def count_rows(db_name: str, table_name: str) -> int:
+    """
+    Возвращает количество строк в таблице table_name.
+    """
+    conn = connect_db(db_name)
+    count = conn.execute(f"SELECT COUNT(*) FROM {table_name};").fetchone()[0]
+    close_db(conn)
+    return count
+
+
+def iter_table_chunks(db_name: str, table_name: str, columns: Optional[Sequence[str]] = None,
+                      chunksize: int = 5000) -> Iterator[pd.DataFrame]:
+    """
+    Выгружает таблицу порциями по chunksize строк (например, для постепенного
+    отображения в дашборде). Если columns задан, читаются только эти столбцы.
+    """
+    import pandas as pd
+
+    select = ", ".join(columns) if columns else "*"
+    query = f"SELECT {select} FROM {table_name};"
+    conn = connect_db(db_name)
+    try:
+        yield from pd.read_sql(query, conn, chunksize=chunksize)
+    finally:
+        close_db(conn)
+
 
 def close_db(conn: sqlite3.Connection) -> None:
     """
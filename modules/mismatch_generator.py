@@ -0,0 +1,276 @@
+from itertools import combinations, islice, product
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+'==================== ГЕНЕРАЦИЯ ВАРИАНТОВ С НЕСОВПАДЕНИЯМИ ===================='
+
+# Порядок каналов совпадает с one_hot_atgc: индекс основания = его "приоритет"
+# в encode_7channels (A < T < G < C)
+BASES = "ATGC"
+RNA_BASES = "AUGC"
+COMPLEMENT = {"A": "T", "T": "A", "G": "C", "C": "G"}
+
+ENCODINGS = ("or", "stacked", "7channels")
+
+# В Table S8 несовпадения встречаются только на позициях -1..-19
+DATASET_MAX_DISTANCE = 19
+
+# Таблица перевода ASCII -> код основания (-1 для недопустимых символов)
+_BASE_CODES = np.full(256, -1, dtype=np.int8)
+for _i, _b in enumerate(BASES):
+    _BASE_CODES[ord(_b)] = _i
+
+# Подпись new_pairing по (новое основание РНК, исходное основание РНК):
+# ДНК-партнёр — комплемент исходного основания, например G -> A даёт "rA:dC"
+_PAIRING_LABELS = np.array(
+    [[f"r{RNA_BASES[new]}:d{COMPLEMENT[BASES[old]]}" for old in range(4)] for new in range(4)],
+    dtype=object
+)
+
+
+def sequences_to_codes(sequences: Sequence[str]) -> np.ndarray:
+    """
+    Переводит список последовательностей одинаковой длины в матрицу кодов N x L
+    (A=0, T=1, G=2, C=3) без поэлементного обхода строк.
+
+    :param sequences: последовательности из символов A, T, G, C
+    :return: матрица int8 размера N x L
+    """
+    if len(sequences) == 0:
+        return np.zeros((0, 0), dtype=np.int8)
+
+    length = len(sequences[0])
+    if any(len(seq) != length for seq in sequences):
+        raise ValueError("Все последовательности в батче должны иметь одинаковую длину.")
+
+    try:
+        raw = np.frombuffer("".join(sequences).encode("ascii"), dtype=np.uint8)
+    except UnicodeEncodeError:
+        raise ValueError("Последовательности должны содержать только символы A, T, G, C.") from None
+    codes = _BASE_CODES[raw].reshape(len(sequences), length)
+    if (codes < 0).any():
+        raise ValueError("Последовательности должны содержать только символы A, T, G, C.")
+    return codes
+
+
+def codes_to_sequences(codes: np.ndarray) -> np.ndarray:
+    """
+    Обратное преобразование: матрица кодов N x L -> массив строк длины N.
+    Нужно только если строки действительно требуются (например, для записи в БД).
+    """
+    letters = np.frombuffer(BASES.encode("ascii"), dtype="S1")[codes]
+    return np.ascontiguousarray(letters).view(f"S{codes.shape[1]}").ravel().astype(str)
+
+
+def _one_hot(codes: np.ndarray) -> np.ndarray:
+    """Батчевый аналог one_hot_atgc: B x L -> B x 4 x L."""
+    return (codes[:, None, :] == np.arange(4, dtype=np.int8)[None, :, None]).astype(np.int8)
+
+
+def encode_batch(dna_codes: np.ndarray, rna_codes: np.ndarray, encodings: Sequence[str] = ENCODINGS,
+                 pam_location: str = "last", pam_length: int = 3) -> Dict[str, np.ndarray]:
+    """
+    Векторизованная версия encode_or / encode_stacked / encode_7channels для целого батча.
+    Результат каждой схемы — матрица B x (C*L), построчно совпадающая по значениям с
+    encode_*(dna, rna).flatten() для соответствующей пары последовательностей.
+    В отличие от encode_* (int64), матрицы имеют тип int8 — для экономии памяти.
+
+    :param dna_codes: коды ДНК, B x L
+    :param rna_codes: коды РНК, B x L
+    :param encodings: какие схемы кодирования считать ("or", "stacked", "7channels")
+    :param pam_location: Расположение PAM ("first" или "last")
+    :param pam_length: Длина PAM-области
+    :return: словарь {"encoded_<схема>": матрица}
+    """
+    unknown = set(encodings) - set(ENCODINGS)
+    if unknown:
+        raise ValueError(f"Неизвестные схемы кодирования: {sorted(unknown)}.")
+
+    n_rows, length = dna_codes.shape
+    dna_encoded = _one_hot(dna_codes)
+    rna_encoded = _one_hot(rna_codes)
+    result = {}
+
+    if "or" in encodings:
+        result["encoded_or"] = (dna_encoded | rna_encoded).reshape(n_rows, -1)
+
+    if "stacked" in encodings:
+        result["encoded_stacked"] = np.concatenate((dna_encoded, rna_encoded), axis=1).reshape(n_rows, -1)
+
+    if "7channels" in encodings:
+        # ATGC каналы: -1 при совпадении, 1 для обоих оснований несовпадения
+        match = dna_encoded & rna_encoded
+        mismatch = dna_encoded ^ rna_encoded
+        atgc_channels = mismatch - match
+
+        # R и D каналы
+        differs = dna_codes != rna_codes
+        d_channel = (differs & (dna_codes < rna_codes)).astype(np.int8)
+        r_channel = (differs & (dna_codes > rna_codes)).astype(np.int8)
+
+        # F канал (обозначает PAM-область)
+        f_channel = np.zeros((n_rows, length), dtype=np.int8)
+        if pam_location == "last":
+            f_channel[:, -pam_length:] = 1
+        elif pam_location == "first":
+            f_channel[:, :pam_length] = 1
+
+        combined = np.concatenate(
+            (atgc_channels, r_channel[:, None, :], d_channel[:, None, :], f_channel[:, None, :]),
+            axis=1
+        )
+        result["encoded_7channels"] = combined.reshape(n_rows, -1)
+
+    return result
+
+
+def _position_to_index(position: int, length: int, pam_location: str, pam_length: int) -> int:
+    """
+    Переводит mismatch_position (отрицательное число, -1 — ближайший к PAM нуклеотид)
+    в индекс символа в строке длины length.
+    """
+    if position >= 0:
+        raise ValueError("mismatch_position должна быть отрицательным целым (не 0).")
+    if pam_location == "last":
+        index = length - pam_length + position
+        in_range = 0 <= index < length - pam_length
+    elif pam_location == "first":
+        index = pam_length - position - 1
+        in_range = pam_length <= index < length
+    else:
+        raise ValueError("pam_location должен быть 'first' или 'last'.")
+    if not in_range:
+        raise ValueError(f"Позиция {position} выходит за пределы последовательности длины {length}.")
+    return index
+
+
+def _mismatch_templates(positions: Sequence[int], n_mismatches: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Перечисляет все шаблоны вариантов с n_mismatches несовпадениями:
+    номера позиций (из positions) и сдвиги замен (0..2 -> одно из трёх других оснований).
+
+    :return: (позиции M x n, сдвиги M x n)
+    """
+    position_sets = list(combinations(range(len(positions)), n_mismatches))
+    shift_sets = list(product(range(3), repeat=n_mismatches))
+    template_positions = np.repeat(np.array(position_sets, dtype=np.intp), len(shift_sets), axis=0)
+    template_shifts = np.tile(np.array(shift_sets, dtype=np.int8), (len(position_sets), 1))
+    return template_positions.reshape(-1, n_mismatches), template_shifts.reshape(-1, n_mismatches)
+
+
+def _build_batch(pm_codes: np.ndarray, first_index: int, start: int, stop: int,
+                 position_labels: np.ndarray, position_columns: np.ndarray,
+                 template_positions: np.ndarray, template_shifts: np.ndarray,
+                 encodings: Sequence[str], pam_location: str, pam_length: int) -> Dict[str, np.ndarray]:
+    """
+    Строит варианты с номерами start..stop-1 из перебора "каждый гид x каждый шаблон"
+    (номер варианта = номер гида * число шаблонов + номер шаблона).
+    """
+    n_templates = template_positions.shape[0]
+    variant_ids = np.arange(start, stop)
+    guide_rows = variant_ids // n_templates
+    template_ids = variant_ids % n_templates
+    variant_positions = template_positions[template_ids]
+    variant_shifts = template_shifts[template_ids]
+
+    dna_codes = pm_codes[guide_rows]
+    rna_codes = dna_codes.copy()
+    rows = np.arange(len(variant_ids))
+    columns = position_columns[variant_positions]
+
+    # Заменяем основание на одно из трёх других: (old + 1 + shift) % 4
+    old_bases = dna_codes[rows[:, None], columns]
+    new_bases = (old_bases + 1 + variant_shifts) % 4
+    rna_codes[rows[:, None], columns] = new_bases
+
+    batch = {
+        "guide_index": guide_rows + first_index,
+        "mismatch_position": position_labels[variant_positions],
+        "new_pairing": _PAIRING_LABELS[new_bases, old_bases],
+        "genome_input": dna_codes,
+        "sgRNA_input": rna_codes,
+    }
+    batch.update(encode_batch(dna_codes, rna_codes, encodings, pam_location, pam_length))
+    return batch
+
+
+def iter_mismatch_batches(guides: Iterable[str], guides_per_batch: int = 1000,
+                          variants_per_batch: int = 50000, include_double: bool = False, positions: Optional[Sequence[int]] = None,
+                          encodings: Sequence[str] = ENCODINGS, pam_location: str = "last",
+                          pam_length: int = 3) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Потоково перечисляет все варианты PM-гидов с одним (и, опционально, двумя)
+    несовпадениями и сразу кодирует их теми же схемами, что и add_new_features.
+
+    Гиды задаются в той же ориентации, что и 'genome_input' / 'sgRNA_input'
+    (включая PAM-область), и читаются из guides порциями по guides_per_batch,
+    поэтому вход может быть генератором на миллионы последовательностей.
+    Варианты каждой порции выдаются батчами не более чем по variants_per_batch строк:
+    сначала одиночные несовпадения, затем (если include_double) двойные.
+    Так память на один батч ограничена независимо от числа шаблонов
+    (для 19 позиций: 57 одиночных и 1539 двойных вариантов на гид).
+
+    Каждый батч — словарь numpy-массивов, B — число вариантов в батче,
+    n — число несовпадений (1 или 2):
+      - 'guide_index' (B,) — номер PM-гида во входном потоке
+      - 'mismatch_position' (B, n) — позиции несовпадений (-1 — ближайшая к PAM)
+      - 'new_pairing' (B, n) — подписи вида 'rA:dC'
+      - 'genome_input', 'sgRNA_input' (B, L) — коды оснований (см. codes_to_sequences)
+      - 'encoded_or', 'encoded_stacked', 'encoded_7channels' (B, C*L) — кодировки
+
+    :param guides: последовательности PM-гидов одинаковой длины
+    :param guides_per_batch: сколько PM-гидов читать из guides за раз
+    :param variants_per_batch: максимальное число вариантов (строк) в одном батче
+    :param include_double: перечислять ли также пары несовпадений
+    :param positions: различные отрицательные позиции для несовпадений
+                      (по умолчанию — -1..-19, как в Table S8)
+    :param encodings: какие схемы кодирования считать
+    :param pam_location: Расположение PAM ("first" или "last")
+    :param pam_length: Длина PAM-области
+    """
+    if guides_per_batch < 1:
+        raise ValueError("guides_per_batch должен быть положительным.")
+    if variants_per_batch < 1:
+        raise ValueError("variants_per_batch должен быть положительным.")
+
+    mismatch_counts = (1, 2) if include_double else (1,)
+    guides_iter = iter(guides)
+    first_index = 0
+    length = None
+
+    while True:
+        chunk = list(islice(guides_iter, guides_per_batch))
+        if not chunk:
+            break
+        pm_codes = sequences_to_codes(chunk)
+
+        # Позиции и шаблоны замен считаем один раз — по длине первой порции
+        if length is None:
+            length = pm_codes.shape[1]
+            if length <= pam_length:
+                raise ValueError(f"Длина PM-гидов ({length}) должна быть больше длины PAM ({pam_length}).")
+            if positions is None:
+                position_labels = -np.arange(1, min(DATASET_MAX_DISTANCE, length - pam_length) + 1)
+            else:
+                position_labels = np.asarray(positions, dtype=int).ravel()
+                if len(position_labels) == 0:
+                    raise ValueError("Список positions не должен быть пустым.")
+                if len(set(position_labels.tolist())) != len(position_labels):
+                    raise ValueError("Позиции в positions не должны повторяться.")
+            position_columns = np.array(
+                [_position_to_index(int(p), length, pam_location, pam_length) for p in position_labels],
+                dtype=np.intp
+            )
+            templates = {n: _mismatch_templates(position_labels, n) for n in mismatch_counts}
+        elif pm_codes.shape[1] != length:
+            raise ValueError("Все PM-гиды должны иметь одинаковую длину.")
+
+        for n_mismatches in mismatch_counts:
+            template_positions, template_shifts = templates[n_mismatches]
+            n_variants = len(chunk) * template_positions.shape[0]
+            for start in range(0, n_variants, variants_per_batch):
+                stop = min(start + variants_per_batch, n_variants)
+                yield _build_batch(pm_codes, first_index, start, stop, position_labels, position_columns,
+                                   template_positions, template_shifts, encodings, pam_location, pam_length)
+        first_index += len(chunk)
@@ -1,6 +1,10 @@
+from __future__ import annotations
+
 import os
-import requests
-import pandas as pd
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 '==================== ЗАГРУЗКА СЫРЫХ ДАННЫХ ИЗ СЕТИ ===================='
 
@@ -10,6 +14,8 @@ def download_data(url: str, local_filename: str) -> None:
     Если файл уже существует, пропускает скачивание.
     """
     if not os.path.exists(local_filename):
+        import requests
+
         print(f"Скачиваем файл из {url}...")
         response = requests.get(url)
         response.raise_for_status()  # проверяем, что статус 200 ОК
@@ -26,6 +32,8 @@ def txt_to_df(local_filename: str) -> pd.DataFrame:
     Предполагается табуляция (\t).
     Переименовывает первый безымянный столбец в 'key'.
     """
+    import pandas as pd
+
     df = pd.read_csv(local_filename, sep="\t")
     # Переименуем безымянный столбец (если он действительно без названия)
     df.rename(columns={df.columns[0]: "key"}, inplace=True)
@@ -1,11 +1,97 @@
-import streamlit as st
-import pandas as pd
 import os
-import plotly.express as px
-from plotly.subplots import make_subplots
-import plotly.graph_objects as go
+import streamlit as st
+
+from modules.db_manager import get_db_name, count_rows, iter_table_chunks
+
+# pandas и plotly не импортируются при загрузке модуля: сначала отрисовываем
+# "каркас" страницы, а тяжёлые библиотеки подгружаем там, где они нужны
+
+# Все столбцы clean_data, кроме закодированных матриц (encoded_*): они занимают
+# большую часть таблицы, а в дашборде не используются, поэтому их не читаем.
+DASHBOARD_COLUMNS = [
+    "key",
+    "perfect_match_sgRNA",
+    "gene",
+    "sgRNA_sequence",
+    "mismatch_position",
+    "new_pairing",
+    "K562",
+    "Jurkat",
+    "mean_relative_gamma",
+    "genome_input",
+    "sgRNA_input",
+    "gc_content",
+    "pam",
+]
+NUMERIC_COLUMNS = ["mismatch_position", "mean_relative_gamma", "gc_content"]
+CHUNK_SIZE = 5000
+
+
+@st.cache_resource
+def get_data_store() -> dict:
+    """
+    Общий для всех сессий кэш загруженных таблиц: повторные запуски и
+    новые сессии не читают базу заново.
+    """
+    return {}
+
+
+def load_data(db_name: str):
+    """
+    Загружает clean_data порциями. По мере чтения обновляются индикатор прогресса,
+    число загруженных строк и сводка по числовым признакам.
+    Ключ кэша включает время изменения файла, чтобы после перезапуска
+    пайплайна данные перечитывались; устаревшие версии той же базы удаляются.
+    """
+    store = get_data_store()
+    cache_key = (db_name, os.path.getmtime(db_name))
+    if cache_key in store:
+        return store[cache_key]
+
+    import pandas as pd
+
+    total = count_rows(db_name, table_name="clean_data")
+    progress = st.progress(0.0, text="Загрузка данных...")
+    summary_placeholder = st.empty()
+
+    # Накопительная сводка: count, sum, min, max по каждому числовому столбцу
+    running = pd.DataFrame(0.0, index=["count", "sum", "min", "max"], columns=NUMERIC_COLUMNS)
+    running.loc["min"] = float("inf")
+    running.loc["max"] = float("-inf")
+
+    chunks = []
+    loaded = 0
+    for chunk in iter_table_chunks(db_name, table_name="clean_data",
+                                   columns=DASHBOARD_COLUMNS, chunksize=CHUNK_SIZE):
+        chunks.append(chunk)
+        loaded += len(chunk)
+
+        numeric = chunk[NUMERIC_COLUMNS]
+        running.loc["count"] += numeric.count()
+        running.loc["sum"] += numeric.sum()
+        running.loc["min"] = running.loc["min"].combine(numeric.min(), min)
+        running.loc["max"] = running.loc["max"].combine(numeric.max(), max)
+
+        progress.progress(min(loaded / total, 1.0) if total else 1.0,
+                          text=f"Загружено строк: {loaded} из {total}")
+        summary = pd.DataFrame({
+            "count": running.loc["count"],
+            "mean": running.loc["sum"] / running.loc["count"],
+            "min": running.loc["min"],
+            "max": running.loc["max"],
+        }).T
+        summary_placeholder.dataframe(summary)
+    progress.empty()
+    summary_placeholder.empty()
+
+    df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=DASHBOARD_COLUMNS)
+
+    # Старые версии той же базы больше не нужны — не держим их в памяти
+    for key in [key for key in store if key[0] == db_name]:
+        del store[key]
+    store[cache_key] = df
+    return df
 
-from modules.db_manager import get_db_name, table_to_dataframe
 
 def main():
 
@@ -21,7 +107,7 @@ def main():
 
     # 1) Загрузка данных
     st.subheader("Загрузка данных из базы")
-    df = table_to_dataframe(db_name, table_name='clean_data')
+    df = load_data(db_name)
     st.write(f"Всего строк: {len(df)}")
 
     # 2) Фильтр по pam
@@ -38,6 +124,10 @@ def main():
     
     st.write(f"Отфильтровано строк: {len(df_filtered)}")
     
+    # plotly нужен только для графиков — импортируем после отрисовки фильтров
+    import plotly.express as px
+    from plotly.subplots import make_subplots
+
     # 3) График распределения mean_relative_gamma (с цветовой группировкой по pam)
     st.subheader("Распределение mean_relative_gamma")
     fig_hist = px.histogram(
@@ -87,7 +177,7 @@ def main():
     
     # 5) Дополнительная статистика: описательные данные
     st.subheader("Основные статистики по числовым признакам")
-    numeric_cols = ["mismatch_position", "mean_relative_gamma", "gc_content"]
+    numeric_cols = NUMERIC_COLUMNS
     st.write(df_filtered[numeric_cols].describe())
 
     # 6) (Опционально) Корреляционная матрица